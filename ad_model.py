@@ -1,11 +1,50 @@
 import streamlit as st
+import math
+from enum import IntEnum
+import importlib.util
+import os
+import smtplib
+import threading
+from email.mime.text import MIMEText
+from dotenv import load_dotenv
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
-import base64
 from pathlib import Path
-import streamlit.components.v1 as components
 
+try:
+    import numba as nb
+    from numba import cfunc, njit, prange
+except ImportError:
+    nb = None
+    prange = range
+
+    def njit(*args, **kwargs):
+        return lambda f: f
+
+# numbalsoda takes seconds to import and only serves problems too stiff for RK4, so load it on first use
+HAS_NUMBALSODA = nb is not None and importlib.util.find_spec("numbalsoda") is not None
+
+
+class Kin(IntEnum):
+    MONOD = 0
+    LINEAR = 1
+    HALDANE = 2
+    CONTOIS = 3
+    TEISSIER = 4
+    MOSER = 5
+    CHEN_HASHIMOTO = 6
+    ANDREWS = 7
+
+
+kinetics_ids = {
+    "monod": Kin.MONOD,
+    "linear": Kin.LINEAR,
+    "haldane": Kin.HALDANE,
+    "contois": Kin.CONTOIS,
+    "teissier": Kin.TEISSIER,
+    "moser": Kin.MOSER,
+    "chen-hashimoto": Kin.CHEN_HASHIMOTO,
+    "andrews": Kin.ANDREWS,
+}
 
 
 st.set_page_config(page_title="Anaerobic Digestion Model", layout="wide")
@@ -22,17 +61,19 @@ st.markdown("### 📘 Quick Start Guide")
 #else:
 #    st.warning("📄 The PDF user guide (problem1_description.pdf) was not found in the app folder.")
 
+# Read the guide once per process; the mtime argument invalidates the cache if the file is replaced
+@st.cache_resource
+def load_pdf(path, mtime):
+    return Path(path).read_bytes()
+
+
 pdf_path = Path("problem1_description.pdf")
 
 if pdf_path.exists():
-    with open(pdf_path, "rb") as f:
-        pdf_data = f.read()
-        base64_pdf = base64.b64encode(pdf_data).decode("utf-8")
-
     # Download button
     st.download_button(
         label="📄 Download PDF Guide",
-        data=pdf_data,
+        data=load_pdf(str(pdf_path), pdf_path.stat().st_mtime),
         file_name="problem1_description.pdf",
         mime="application/pdf"
     )
@@ -56,7 +97,8 @@ kinetic_descriptions = {
 kinetics = st.sidebar.selectbox("Kinetic model", list(kinetic_descriptions.keys()))
 st.sidebar.latex(kinetic_descriptions[kinetics])
 
-params = {'kinetics': kinetics}
+# The solvers dispatch on the small-int kin_id; the label is only kept for display and caching
+params = {'kinetics': kinetics, 'kin_id': kinetics_ids[kinetics]}
 
 st.sidebar.subheader("2️⃣ Kinetic Parameters")
 if kinetics in ['monod', 'haldane', 'contois', 'teissier', 'moser', 'chen-hashimoto', 'andrews']:
@@ -65,16 +107,19 @@ if kinetics in ['monod', 'haldane', 'moser', 'andrews']:
     params['K_S'] = st.sidebar.number_input("K_S [g/L]", 0.1, 1000.0, 20.0, step=0.5)
 if kinetics in ['haldane', 'andrews']:
     params['K_I'] = st.sidebar.number_input("K_I [g/L]", 1.0, 1000.0, 250.0, step=5.0)
+    params['inv_K_I'] = 1.0 / params['K_I']
 if kinetics == 'contois':
     params['K_C'] = st.sidebar.number_input("K_C [L/g]", 0.1, 50.0, 3.5, step=0.1)
 if kinetics == 'teissier':
     params['K_T'] = st.sidebar.number_input("K_T [g/L]", 0.1, 50.0, 15.0, step=0.1)
+    params['inv_K_T'] = 1.0 / params['K_T']
 if kinetics == 'linear':
     params['k'] = st.sidebar.number_input("k [1/day]", 0.001, 1.0, 0.05)
 if kinetics == 'moser':
     params['n'] = st.sidebar.number_input("n (Moser exponent)", 1.0, 3.0, 1.5)
 if kinetics == 'chen-hashimoto':
     params['S0'] = st.sidebar.number_input("S₀ [g/L]", 1.0, 1000.0, 100.0, step = 2.0)
+    params['inv_S0'] = 1.0 / params['S0']
     params['k_CH'] = st.sidebar.number_input("k_CH", 0.01, 1.0, 0.2)
 
 st.sidebar.subheader("3️⃣ General Parameters")
@@ -83,7 +128,6 @@ params['Y_g'] = st.sidebar.number_input("Y_b (Biogas yield)", 0.0, 1.0, 0.314)
 t1 = 0
 S0 = st.sidebar.number_input("Initial substrate S₀ [g/L]", 0.1, 1000.0, 100.0, step = 2.0)
 B0 = st.sidebar.number_input("Initial biomass B₀ [g/L]", 0.01, 100.0, 1.0)
-y0 = [S0, B0, 0.0]
 t2 = st.sidebar.slider("Simulation time [days]", 10, 200, 50, step = 1)
 
 if 'simulate' not in st.session_state:
@@ -94,43 +138,387 @@ if st.sidebar.button("Run Simulation"):
 
 # Model equations
     
-def odefun(t, y, p):
-    S_j, B, G = y
-    kinetics = p['kinetics']
-
-    if kinetics == 'monod':
-        mu = p['mu_max'] * S_j / (p['K_S'] + S_j)
-        R_BS_j = mu * B
-    elif kinetics == 'linear':
-        R_BS_j = p['k'] * S_j
-    elif kinetics == 'haldane':
-        mu = p['mu_max'] * (S_j / (p['K_S'] + S_j)) * (p['K_I'] / (p['K_I'] + S_j))
-        R_BS_j = mu * B
-    elif kinetics == 'contois':
-        mu = p['mu_max'] * ((S_j / B) / (p['K_C'] + S_j / B))
-        R_BS_j = mu * B
-    elif kinetics == 'teissier':
-        mu = p['mu_max'] * (1 - np.exp(-S_j / p['K_T']))
-        R_BS_j = mu * B
-    elif kinetics == 'moser':
-        mu = p['mu_max'] * S_j ** p['n'] / (p['K_S'] + S_j ** p['n'])
-        R_BS_j = mu * B
-    elif kinetics == 'chen-hashimoto':
-        S_ratio = S_j / p['S0']
-        mu = p['mu_max'] * S_ratio / (p['k_CH'] + S_ratio * (1 - S_ratio))
-        R_BS_j = mu * B
-    elif kinetics == 'andrews':
-        mu = p['mu_max'] * S_j / (p['K_S'] + S_j + S_j ** 2 / p['K_I'])
-        R_BS_j = mu * B
-    else:
-        raise ValueError(f"Unknown kinetics type: {kinetics}")
+def make_rhs(p):
+    # Specialize the RHS once per run: parameters become closure locals, no dict/str work per step
+    kin_id = p['kin_id']
+    Y_g = p['Y_g']
+    mu_max = p.get('mu_max')
+    K_S = p.get('K_S')
+    inv_K_I = p.get('inv_K_I')
+    K_C = p.get('K_C')
+    inv_K_T = p.get('inv_K_T')
+    k = p.get('k')
+    n = p.get('n')
+    inv_S0 = p.get('inv_S0')
+    k_CH = p.get('k_CH')
+
+    def rhs_monod(t, y):
+        S_j, B = y
+        R_BS_j = mu_max * S_j / (K_S + S_j) * B
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    def rhs_linear(t, y):
+        S_j, B = y
+        R_BS_j = k * S_j
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    def rhs_haldane(t, y):
+        S_j, B = y
+        R_BS_j = mu_max * S_j / ((K_S + S_j) * (1 + S_j * inv_K_I)) * B
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    def rhs_contois(t, y):
+        S_j, B = y
+        r = S_j / B
+        R_BS_j = mu_max * r / (K_C + r) * B
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    def rhs_teissier(t, y):
+        S_j, B = y
+        # Same clamp as Moser: a solver overshoot to S < 0 would overflow the exponential
+        R_BS_j = mu_max * (1 - math.exp(-max(S_j, 0.0) * inv_K_T)) * B
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    def rhs_moser(t, y):
+        S_j, B = y
+        # A solver overshoot to S < 0 would otherwise turn S**n into NaN
+        Sn = max(S_j, 0.0) ** n
+        R_BS_j = mu_max * Sn / (K_S + Sn) * B
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    def rhs_chen_hashimoto(t, y):
+        S_j, B = y
+        S_ratio = S_j * inv_S0
+        R_BS_j = mu_max * S_ratio / (k_CH + S_ratio * (1 - S_ratio)) * B
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    def rhs_andrews(t, y):
+        S_j, B = y
+        R_BS_j = mu_max * S_j / (K_S + S_j + S_j * S_j * inv_K_I) * B
+        return (-R_BS_j - Y_g * R_BS_j, R_BS_j)
+
+    dispatch = {
+        Kin.MONOD: rhs_monod,
+        Kin.LINEAR: rhs_linear,
+        Kin.HALDANE: rhs_haldane,
+        Kin.CONTOIS: rhs_contois,
+        Kin.TEISSIER: rhs_teissier,
+        Kin.MOSER: rhs_moser,
+        Kin.CHEN_HASHIMOTO: rhs_chen_hashimoto,
+        Kin.ANDREWS: rhs_andrews,
+    }
+    if kin_id not in dispatch:
+        raise ValueError(f"Unknown kinetics type: {kin_id}")
+    return dispatch[kin_id]
+
+
+def make_jac(p):
+    # Closed-form Jacobian of make_rhs(p), so LSODA never falls back to finite differences.
+    # With R = R_BS_j(S_j, B): dS/dt = -(1 + Y_g) R and dB/dt = R.
+    kin_id = p['kin_id']
+    c_S = -(1 + p['Y_g'])
+    mu_max = p.get('mu_max')
+    K_S = p.get('K_S')
+    inv_K_I = p.get('inv_K_I')
+    K_C = p.get('K_C')
+    inv_K_T = p.get('inv_K_T')
+    k = p.get('k')
+    n = p.get('n')
+    inv_S0 = p.get('inv_S0')
+    k_CH = p.get('k_CH')
+
+    def jac_from(dR_dS, dR_dB):
+        return np.array([[c_S * dR_dS, c_S * dR_dB], [dR_dS, dR_dB]])
+
+    def jac_monod(t, y):
+        S_j, B = y
+        d = K_S + S_j
+        return jac_from(mu_max * K_S / (d * d) * B, mu_max * S_j / d)
+
+    def jac_linear(t, y):
+        return jac_from(k, 0.0)
+
+    def jac_haldane(t, y):
+        S_j, B = y
+        d = (K_S + S_j) * (1 + S_j * inv_K_I)
+        return jac_from(mu_max * (K_S - inv_K_I * S_j * S_j) / (d * d) * B, mu_max * S_j / d)
+
+    def jac_contois(t, y):
+        S_j, B = y
+        d = K_C * B + S_j
+        return jac_from(mu_max * K_C * B * B / (d * d), mu_max * S_j * S_j / (d * d))
+
+    def jac_teissier(t, y):
+        S_j, B = y
+        e = math.exp(-max(S_j, 0.0) * inv_K_T)
+        return jac_from(mu_max * inv_K_T * e * B, mu_max * (1 - e))
+
+    def jac_moser(t, y):
+        S_j, B = y
+        S_pos = max(S_j, 0.0)
+        Sn = S_pos ** n
+        d = K_S + Sn
+        return jac_from(mu_max * K_S * n * S_pos ** (n - 1) / (d * d) * B, mu_max * Sn / d)
+
+    def jac_chen_hashimoto(t, y):
+        S_j, B = y
+        S_ratio = S_j * inv_S0
+        d = k_CH + S_ratio * (1 - S_ratio)
+        return jac_from(mu_max * inv_S0 * (k_CH + S_ratio * S_ratio) / (d * d) * B, mu_max * S_ratio / d)
+
+    def jac_andrews(t, y):
+        S_j, B = y
+        d = K_S + S_j + S_j * S_j * inv_K_I
+        return jac_from(mu_max * (K_S - inv_K_I * S_j * S_j) / (d * d) * B, mu_max * S_j / d)
+
+    dispatch = {
+        Kin.MONOD: jac_monod,
+        Kin.LINEAR: jac_linear,
+        Kin.HALDANE: jac_haldane,
+        Kin.CONTOIS: jac_contois,
+        Kin.TEISSIER: jac_teissier,
+        Kin.MOSER: jac_moser,
+        Kin.CHEN_HASHIMOTO: jac_chen_hashimoto,
+        Kin.ANDREWS: jac_andrews,
+    }
+    if kin_id not in dispatch:
+        raise ValueError(f"Unknown kinetics type: {kin_id}")
+    return dispatch[kin_id]
+
+
+# Compiled model equations (numbalsoda)
+# Layout of the float64 `data` array handed to the compiled RHS; kin_id goes last
+lsoda_param_keys = ('mu_max', 'K_S', 'inv_K_I', 'K_C', 'inv_K_T', 'k', 'n', 'inv_S0', 'k_CH', 'Y_g')
+
+
+def lsoda_data(p):
+    data = [p.get(key, 0.0) for key in lsoda_param_keys]
+    data.append(p['kin_id'])
+    return np.array(data, dtype=np.float64)
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def split_rates(R_BS_j, Y_g):
+    return -R_BS_j - Y_g * R_BS_j, R_BS_j
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_monod_nb(S_j, B, Y_g, mu_max, K_S):
+    return split_rates(mu_max * S_j / (K_S + S_j) * B, Y_g)
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_linear_nb(S_j, B, Y_g, k):
+    return split_rates(k * S_j, Y_g)
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_haldane_nb(S_j, B, Y_g, mu_max, K_S, inv_K_I):
+    return split_rates(mu_max * S_j / ((K_S + S_j) * (1.0 + S_j * inv_K_I)) * B, Y_g)
+
 
-    R_GS_j = p['Y_g'] * R_BS_j
-    dS_j_dt = -R_BS_j - R_GS_j
-    dB_dt = R_BS_j
-    dG_dt = R_GS_j
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_contois_nb(S_j, B, Y_g, mu_max, K_C):
+    r = S_j / B
+    return split_rates(mu_max * r / (K_C + r) * B, Y_g)
 
-    return [dS_j_dt, dB_dt, dG_dt]
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_teissier_nb(S_j, B, Y_g, mu_max, inv_K_T):
+    return split_rates(mu_max * (1.0 - math.exp(-max(S_j, 0.0) * inv_K_T)) * B, Y_g)
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_moser_nb(S_j, B, Y_g, mu_max, K_S, n):
+    Sn = max(S_j, 0.0) ** n
+    return split_rates(mu_max * Sn / (K_S + Sn) * B, Y_g)
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_chen_hashimoto_nb(S_j, B, Y_g, mu_max, inv_S0, k_CH):
+    S_ratio = S_j * inv_S0
+    return split_rates(mu_max * S_ratio / (k_CH + S_ratio * (1.0 - S_ratio)) * B, Y_g)
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rhs_andrews_nb(S_j, B, Y_g, mu_max, K_S, inv_K_I):
+    return split_rates(mu_max * S_j / (K_S + S_j + S_j * S_j * inv_K_I) * B, Y_g)
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def rates_nb(S_j, B, p_, kin):
+    mu_max, K_S, inv_K_I, K_C, inv_K_T, k, n, inv_S0, k_CH, Y_g = (
+        p_[0], p_[1], p_[2], p_[3], p_[4], p_[5], p_[6], p_[7], p_[8], p_[9]
+    )
+    if kin == Kin.MONOD:
+        return rhs_monod_nb(S_j, B, Y_g, mu_max, K_S)
+    elif kin == Kin.LINEAR:
+        return rhs_linear_nb(S_j, B, Y_g, k)
+    elif kin == Kin.HALDANE:
+        return rhs_haldane_nb(S_j, B, Y_g, mu_max, K_S, inv_K_I)
+    elif kin == Kin.CONTOIS:
+        return rhs_contois_nb(S_j, B, Y_g, mu_max, K_C)
+    elif kin == Kin.TEISSIER:
+        return rhs_teissier_nb(S_j, B, Y_g, mu_max, inv_K_T)
+    elif kin == Kin.MOSER:
+        return rhs_moser_nb(S_j, B, Y_g, mu_max, K_S, n)
+    elif kin == Kin.CHEN_HASHIMOTO:
+        return rhs_chen_hashimoto_nb(S_j, B, Y_g, mu_max, inv_S0, k_CH)
+    else:
+        return rhs_andrews_nb(S_j, B, Y_g, mu_max, K_S, inv_K_I)
+
+
+# Streamlit re-executes this script on every interaction, so build the cfunc once per process;
+# the @njit kernels above are also cached on disk across restarts
+@st.cache_resource
+def lsoda_rhs():
+    from numbalsoda import lsoda_sig
+
+    @cfunc(lsoda_sig)
+    def rhs(t, u, du, p):
+        p_ = nb.carray(p, (11,))
+        dS, dB = rates_nb(u[0], u[1], p_, int(p_[10]))
+        du[0] = dS
+        du[1] = dB
+
+    return rhs
+
+
+# Fixed-step RK4 on the output grid; each output interval is split into substeps of at most this size [days]
+RK4_MAX_STEP = 0.01
+# Keep h * L below this, L being a bound on the Jacobian norm along the trajectory (RK4 is unstable past ~2.8)
+RK4_STABILITY = 1.0
+# Stiffer problems than this many steps are left to LSODA
+RK4_MAX_STEPS = 200_000
+
+
+@njit(cache=True, fastmath=True, error_model="numpy")
+def integrate_rk4(y0, t_end, n_out, params_arr, kin_id, max_step):
+    out = np.empty((2, n_out))
+    S_j, B = y0[0], y0[1]
+    out[0, 0], out[1, 0] = S_j, B
+    n_sub = max(1, int(math.ceil(t_end / (n_out - 1) / max_step)))
+    h = t_end / ((n_out - 1) * n_sub)
+
+    for i in range(1, n_out):
+        for _ in range(n_sub):
+            k1S, k1B = rates_nb(S_j, B, params_arr, kin_id)
+            k2S, k2B = rates_nb(S_j + 0.5 * h * k1S, B + 0.5 * h * k1B, params_arr, kin_id)
+            k3S, k3B = rates_nb(S_j + 0.5 * h * k2S, B + 0.5 * h * k2B, params_arr, kin_id)
+            k4S, k4B = rates_nb(S_j + h * k3S, B + h * k3B, params_arr, kin_id)
+            S_j += h * (k1S + 2.0 * k2S + 2.0 * k3S + k4S) / 6.0
+            B += h * (k1B + 2.0 * k2B + 2.0 * k3B + k4B) / 6.0
+        out[0, i], out[1, i] = S_j, B
+
+    return out
+
+
+# Trajectories in a sweep are independent, so integrate them across all cores
+@njit(cache=True, parallel=True, fastmath=True, error_model="numpy")
+def sweep_rk4(y0_batch, params_batch, t_end, n_out, kin_id, max_step):
+    N = y0_batch.shape[0]
+    out = np.empty((N, 2, n_out))
+    for i in prange(N):
+        out[i] = integrate_rk4(y0_batch[i], t_end, n_out, params_batch[i], kin_id, max_step[i])
+    return out
+
+
+def jacobian_bound(p, S0, B0):
+    # Bound on |J| over the trajectory: S stays in [0, S0] and B = B0 + (S0 - S) / (1 + Y_g) <= B_max.
+    # The stiff direction is dR/dS, which peaks as S -> 0 for most laws (e.g. mu_max * B / K_S for Monod).
+    kin_id = p['kin_id']
+    c_S = 1 + p['Y_g']
+    B_max = B0 + S0 / c_S
+    mu_max = p.get('mu_max')
+
+    if kin_id == Kin.LINEAR:
+        return c_S * p['k']
+    elif kin_id in (Kin.MONOD, Kin.HALDANE, Kin.ANDREWS):
+        dR_dS = mu_max / p['K_S'] * B_max
+    elif kin_id == Kin.CONTOIS:
+        dR_dS = mu_max / p['K_C']
+    elif kin_id == Kin.TEISSIER:
+        dR_dS = mu_max * p['inv_K_T'] * B_max
+    elif kin_id == Kin.MOSER:
+        # n*K*x^a/(K + x)^2 with x = S^n, a = 1 - 1/n peaks at x = a*K/(2 - a)
+        n, K_S = p['n'], p['K_S']
+        a = 1 - 1 / n
+        x = a * K_S / (2 - a)
+        dR_dS = mu_max * n * K_S * x ** a / (K_S + x) ** 2 * B_max
+    elif kin_id == Kin.CHEN_HASHIMOTO:
+        k_CH = p['k_CH']
+        r_max = S0 * p['inv_S0']
+        d_min = k_CH + min(0.0, r_max * (1 - r_max))
+        if d_min <= 0:
+            return math.inf
+        dR_dS = mu_max * p['inv_S0'] * (k_CH + r_max * r_max) / (d_min * d_min) * B_max
+    else:
+        raise ValueError(f"Unknown kinetics type: {kin_id}")
+    return c_S * dR_dS + mu_max
+
+
+def rk4_max_step(p, S0, B0, T_end):
+    # Largest stable RK4 step, or None if that would take more than RK4_MAX_STEPS steps
+    if nb is None:
+        return None
+    L = jacobian_bound(p, S0, B0)
+    if T_end * L > RK4_STABILITY * RK4_MAX_STEPS:
+        return None
+    return min(RK4_MAX_STEP, RK4_STABILITY / L)
+
+
+def simulate(p, T_end, S0, B0):
+    # lsoda() reads y0 as raw float64, so integer inputs must be converted up front
+    y0 = np.array([S0, B0], dtype=np.float64)
+    t = np.linspace(0, T_end, 300)
+    max_step = rk4_max_step(p, S0, B0, T_end)
+    if max_step is not None:
+        S, B = integrate_rk4(y0, T_end, len(t), lsoda_data(p), int(p['kin_id']), max_step)
+    elif HAS_NUMBALSODA:
+        from numbalsoda import lsoda
+
+        usol, ok = lsoda(lsoda_rhs().address, y0, t, data=lsoda_data(p), rtol=1e-6, atol=1e-9)
+        S, B = usol.T
+    else:
+        from scipy.integrate import solve_ivp
+        S, B = solve_ivp(make_rhs(p), [0, T_end], y0, t_eval=t, method='LSODA', jac=make_jac(p),
+                         rtol=1e-6, atol=1e-9).y
+    # dG/dt = Y_g * dB/dt, so biogas follows from biomass growth and is not integrated
+    G = p['Y_g'] * (B - B0)
+    return np.stack([S, B, G])
+
+
+# Streamlit reruns the whole script on every widget change, so memoize solves on their inputs
+@st.cache_data(max_entries=64)
+def run_sim(kinetics: str, params_tuple: tuple, T_end: float, S0: float, B0: float) -> np.ndarray:
+    return simulate(dict(params_tuple), T_end, S0, B0)
+
+
+@st.cache_data(max_entries=16)
+def run_sweep(kinetics: str, params_tuple: tuple, T_end: float, B0: float,
+              S0_range: tuple, mu_range: tuple, n: int) -> np.ndarray:
+    p = dict(params_tuple)
+    # Kinetics without μ_max (linear) are only swept over S0
+    n_mu = n if 'mu_max' in p else 1
+    S0_grid, mu_grid = np.meshgrid(np.linspace(*S0_range, n), np.linspace(*mu_range, n_mu))
+    S0_grid, mu_grid = S0_grid.ravel(), mu_grid.ravel()
+    points = [dict(p, mu_max=mu) if 'mu_max' in p else p for mu in mu_grid]
+    max_step = [rk4_max_step(p_j, S0_j, B0, T_end) for p_j, S0_j in zip(points, S0_grid)]
+
+    out = np.empty((len(S0_grid), 3, 300))
+    batch = [i for i, h in enumerate(max_step) if h is not None]
+    if batch:
+        y0_batch = np.column_stack([S0_grid[batch], np.full(len(batch), B0)])
+        params_batch = np.stack([lsoda_data(points[i]) for i in batch])
+        SB = sweep_rk4(y0_batch, params_batch, T_end, 300, int(p['kin_id']),
+                       np.array([max_step[i] for i in batch]))
+        out[batch, :2] = SB
+        out[batch, 2] = p['Y_g'] * (SB[:, 1] - B0)
+    # Points too stiff for RK4 are solved one by one, bypassing run_sim's cache
+    for i, h in enumerate(max_step):
+        if h is None:
+            out[i] = simulate(points[i], T_end, S0_grid[i], B0)
+    return out
 
 
 # Show description or results
@@ -204,23 +592,121 @@ def odefun(t, y, p):
 # )
 
 
-if st.session_state.simulate:
-    sol = solve_ivp(lambda t, y: odefun(t, y, params), [t1, t2], y0, t_eval=np.linspace(t1, t2, 300))
-    t = sol.t
-    S, B, G = sol.y
+sim_tab, sweep_tab = st.tabs(["Simulation", "Parameter Sweep"])
+curves = [("Substrate", "blue"), ("Biomass", "red"), ("Biogas", "green")]
+
+# scipy and matplotlib are imported where they are needed, so idle workers never load them
+with sim_tab:
+    if st.session_state.simulate:
+        from matplotlib.figure import Figure
+
+        # float32 is plenty for plotting and halves the data Agg has to walk
+        t = np.linspace(t1, t2, 300, dtype=np.float32)
+        Y = run_sim(kinetics, tuple(sorted(params.items())), float(t2), S0, B0).astype(np.float32)
+
+        st.subheader(" Simulation Output")
+        col1, col2, col3 = st.columns([1, 4, 1])
+        with col2:
+            # Keep one figure per session and redraw into it instead of building a new one per run.
+            # A bare Figure is not registered with pyplot, so it is freed along with the session.
+            if 'fig' not in st.session_state:
+                st.session_state.fig = Figure(figsize=(8, 6))
+                st.session_state.ax = st.session_state.fig.subplots()
+            fig, ax = st.session_state.fig, st.session_state.ax
+            ax.cla()
+            for i, (label, color) in enumerate(curves):
+                ax.plot(t, Y[i], label=label, color=color)
+            ax.set_xlabel("Time [days]")
+            ax.set_ylabel("Concentration [g/L]")
+            ax.grid(True)
+            ax.legend()
+            st.pyplot(fig, clear_figure=False)
+
+with sweep_tab:
+    st.markdown("Solve a grid of initial substrate and μ_max values and show the spread of the results.")
+    S0_range = st.slider("Initial substrate S₀ range [g/L]", 0.1, 1000.0, (50.0, 150.0), step=2.0)
+    if 'mu_max' in params:
+        mu_range = st.slider("μ_max range [1/day]", 0.01, 5.0, (0.2, 0.6))
+    else:
+        mu_range = (0.0, 0.0)
+    n_sweep = st.slider("Grid points per parameter", 2, 30, 10)
+
+    if 'sweep' not in st.session_state:
+        st.session_state.sweep = False
+
+    if st.button("Run Sweep"):
+        st.session_state.sweep = True
+
+    if st.session_state.sweep:
+        from matplotlib.figure import Figure
+
+        t = np.linspace(t1, t2, 300, dtype=np.float32)
+        Y = run_sweep(kinetics, tuple(sorted(params.items())), float(t2), B0, S0_range, mu_range, n_sweep)
+        Y = Y.astype(np.float32)
+
+        col1, col2, col3 = st.columns([1, 4, 1])
+        with col2:
+            fig = Figure(figsize=(8, 6))
+            ax = fig.subplots()
+            for i, (label, color) in enumerate(curves):
+                ax.fill_between(t, Y[:, i].min(axis=0), Y[:, i].max(axis=0), color=color, alpha=0.25)
+                ax.plot(t, np.median(Y[:, i], axis=0), label=label, color=color)
+            ax.set_xlabel("Time [days]")
+            ax.set_ylabel("Concentration [g/L]")
+            ax.grid(True)
+            ax.legend()
+            st.pyplot(fig)
+
 
-    st.subheader(" Simulation Output")
-    col1, col2, col3 = st.columns([1, 4, 1])
-    with col2:
-        fig, ax = plt.subplots(figsize=(8, 6))
-        ax.plot(t, S, label="Substrate", color="blue")
-        ax.plot(t, B, label="Biomass", color="red")
-        ax.plot(t, G, label="Biogas", color="green")
-        ax.set_xlabel("Time [days]")
-        ax.set_ylabel("Concentration [g/L]")
-        ax.grid(True)
-        ax.legend()
-        st.pyplot(fig)
+# Credentials are read from .env once per process instead of on every submission
+@st.cache_resource
+def mail_creds():
+    load_dotenv()
+    return os.getenv("EMAIL_ADDRESS"), os.getenv("EMAIL_PASSWORD"), os.getenv("TO_EMAIL")
+
+
+# One logged-in connection per process, shared by every session, so sockets don't pile up per visitor
+@st.cache_resource
+def smtp_connection():
+    return {'server': None, 'lock': threading.Lock()}
+
+
+# Every session waits on the shared lock, so a stalled connect or send must not hang them all
+SMTP_TIMEOUT = 20
+
+
+def send_feedback(msg):
+    conn = smtp_connection()
+    with conn['lock']:
+        server = conn['server']
+        if server is not None:
+            # Gmail drops idle sessions (421 or a closed socket). Probe before sending rather than
+            # retrying after, so a failure mid-DATA can never deliver the same feedback twice.
+            try:
+                alive = server.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                alive = False
+            if not alive:
+                conn['server'] = None
+                server.close()
+                server = None
+
+        if server is None:
+            EMAIL_ADDRESS, EMAIL_PASSWORD, _ = mail_creds()
+            server = smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=SMTP_TIMEOUT)
+            try:
+                server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+            except Exception:
+                server.close()
+                raise
+            conn['server'] = server
+
+        try:
+            server.send_message(msg)
+        except Exception:
+            conn['server'] = None
+            server.close()
+            raise
 
 
 # Feedback Section
@@ -239,15 +725,7 @@ with st.form("feedback_form"):
             st.warning("Feedback cannot be empty.")
         else:
             try:
-                from email.mime.text import MIMEText
-                import smtplib
-                import os
-                from dotenv import load_dotenv
-
-                load_dotenv()
-                EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
-                EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-                TO_EMAIL = os.getenv("TO_EMAIL")
+                EMAIL_ADDRESS, EMAIL_PASSWORD, TO_EMAIL = mail_creds()
 
                 content = f"Feedback from: {name}\nEmail: {email}\n\nMessage:\n{message}"
                 msg = MIMEText(content)
@@ -255,9 +733,7 @@ with st.form("feedback_form"):
                 msg["From"] = EMAIL_ADDRESS
                 msg["To"] = TO_EMAIL
 
-                with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                    server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-                    server.send_message(msg)
+                send_feedback(msg)
 
                 st.success("✅ Thank you! Your feedback has been sent.")
             except Exception as e: